@@ -54,14 +54,117 @@ FUNCIONES A IMPLEMENTAR:
     calcula un diccionario {nombre:frecuencia} con la frecuencia acumulada de cada nombre
 - mostrar_frecuencias_nombres(registros, limite=10):
     genera un diagrama de barras con las frecuencias de los nombres más populares
+- indexar_por_año(registros):
+    agrupa los registros por año en un diccionario {año: [registros]}
+- indexar_por_genero(registros):
+    agrupa los registros por género en un diccionario {género: [registros]}
+- limpiar_indices():
+    descarta los índices guardados de la lista leída, tras modificar alguno de sus registros
 '''
 
 import csv
+import heapq
+import sys
 from collections import namedtuple, defaultdict
+from operator import itemgetter
 from matplotlib import pyplot as plt
 
+
+# FUNCIONES AUXILIARES:
+
+# Índices calculados a partir de la lista de registros devuelta por la última
+# llamada a 'leer_frecuencias_nombres', para no repetir el mismo recorrido en cada
+# consulta: {construir: (longitud, índice)}. Para cualquier otra lista (p.ej. el
+# resultado de 'filtrar_por_genero') los índices se calculan sin guardarlos.
+_registros_leidos = None
+_indices = dict()
+
+def _obtener_indice(registros, construir):
+    ''' Devuelve el índice que calcula 'construir' a partir de los registros
+
+    Si los registros son la lista devuelta por 'leer_frecuencias_nombres', el índice
+    solo se calcula la primera vez; se vuelve a calcular si se añaden o se quitan
+    registros, pero no si se modifican en el sitio sin cambiar su longitud (en ese
+    caso hay que llamar a 'limpiar_indices').
+    '''
+    if registros is not _registros_leidos:
+        return construir(registros)
+
+    entrada = _indices.get(construir)
+    if entrada is None or entrada[0]!=len(registros):
+        entrada = (len(registros), construir(registros))
+        _indices[construir] = entrada
+    return entrada[1]
+
+
+def limpiar_indices():
+    ''' Descarta los índices guardados, que se volverán a calcular en la siguiente consulta
+
+    Debe llamarse si se modifica algún registro de la lista devuelta por
+    'leer_frecuencias_nombres' después de haberla consultado.
+    '''
+    _indices.clear()
+
+
+def _sumar_frecuencias_por_nombre(registros):
+    ''' Calcula el índice {nombre: frecuencia acumulada}
+
+    Si ya está guardado el índice {nombre: {año: frecuencia}} de la lista leída del
+    fichero, se obtiene sumando sus años, sin volver a recorrer los registros. En
+    otro caso se acumulan las frecuencias en un solo recorrido.
+    '''
+    if registros is _registros_leidos and _sumar_frecuencias_por_nombre_y_año in _indices:
+        frecuencias_por_año = _obtener_indice(registros, _sumar_frecuencias_por_nombre_y_año)
+        return {nombre: sum(frecuencias.values()) for nombre, frecuencias in frecuencias_por_año.items()}
+
+    frecuencias = defaultdict(int)
+    for r in registros:
+        frecuencias[r.nombre] += r.frecuencia
+    return frecuencias
+
+
+def indexar_por_año(registros):
+    ''' Agrupa los registros por año en un solo recorrido
+
+    ENTRADA:
+       - registros: lista de registros (año, nombre, frecuencia, género) -> [Registro(int, str, int, str)]
+    SALIDA:
+       - diccionario con la lista de registros de cada año -> {int: [Registro(int, str, int, str)]}
+    '''
+    registros_por_año = defaultdict(list)
+    for r in registros:
+        registros_por_año[r.año].append(r)
+    return registros_por_año
+
+
+def indexar_por_genero(registros):
+    ''' Agrupa los registros por género en un solo recorrido
+
+    ENTRADA:
+       - registros: lista de registros (año, nombre, frecuencia, género) -> [Registro(int, str, int, str)]
+    SALIDA:
+       - diccionario con la lista de registros de cada género -> {str: [Registro(int, str, int, str)]}
+    '''
+    registros_por_genero = defaultdict(list)
+    for r in registros:
+        registros_por_genero[r.genero].append(r)
+    return registros_por_genero
+
+
+def _sumar_frecuencias_por_nombre_y_año(registros):
+    ''' Calcula en un solo recorrido el índice {nombre: {año: frecuencia}}
+    '''
+    frecuencias = defaultdict(lambda: defaultdict(int))
+    for r in registros:
+        frecuencias[r.nombre][r.año] += r.frecuencia
+    return frecuencias
+
+
 # EJERCICIO 1:
 
+# Se usa una tupla con nombre y no una dataclass con __slots__: el acceso a los
+# atributos de la dataclass es más rápido, pero crear los registros es más lento
+# y, en una sesión completa de consultas, el tiempo total es el mismo
 Registro = namedtuple('Registro', 'año, nombre, frecuencia, genero')
 
 def leer_frecuencias_nombres(fichero):
@@ -71,12 +174,31 @@ def leer_frecuencias_nombres(fichero):
        - fichero: nombre del fichero de entrada -> str
     SALIDA: 
        - lista de registros (año, nombre, frecuencia, género) -> [Registro(int, str, int, str)]
+
+    Las consultas sobre la lista devuelta guardan índices para no recorrerla cada vez.
+    Si se modifican registros de la lista en el sitio, hay que llamar a 'limpiar_indices'.
     '''
+    global _registros_leidos
+
     with open(fichero, 'r', encoding='utf-8') as f:
         lector = csv.reader(f)
         next(lector)
-        registros = [Registro(int(año), nombre, int(frecuencia), genero) 
-                     for año, nombre, frecuencia, genero in lector]
+        # Solo hay unos pocos años distintos: cada uno se convierte a entero una
+        # sola vez y todos los registros de un mismo año comparten el mismo objeto.
+        # Por el mismo motivo se internan los nombres y géneros: las cadenas
+        # repetidas son el mismo objeto, y las comparaciones (==) y los hash al
+        # insertarlas en conjuntos o diccionarios son más baratos
+        años = dict()
+        registros = []
+        for año, nombre, frecuencia, genero in lector:
+            año_int = años.get(año)
+            if año_int is None:
+                año_int = años[año] = int(año)
+            registros.append(Registro(año_int, sys.intern(nombre), int(frecuencia), sys.intern(genero)))
+
+    # Los índices guardados pasan a corresponder a la nueva lista
+    _registros_leidos = registros
+    _indices.clear()
     return registros
 
 
@@ -90,6 +212,11 @@ def filtrar_por_genero(registros, genero):
     SALIDA: 
        - lista de registros seleccionados -> [Registro(int, str, int, str)]
     '''
+    # En la lista leída del fichero, los registros de cada género se separan una
+    # sola vez (se devuelve una copia para que el llamador pueda modificarla). Para
+    # cualquier otra lista, agrupar ambos géneros sería más costoso que filtrar
+    if registros is _registros_leidos:
+        return list(_obtener_indice(registros, indexar_por_genero).get(genero, []))
     return [r for r in registros if r.genero==genero]
 
 
@@ -103,10 +230,14 @@ def calcular_nombres(registros, filtro=None):
     SALIDA: 
        - conjunto de nombres encontrados -> {str}
     '''
-    if filtro is not None:
-        registros = filtrar_por_genero(registros, filtro)
+    if filtro is None:
+        return {r.nombre for r in registros}
 
-    return set(r.nombre for r in registros)
+    # En la lista leída del fichero solo se recorren los registros del género
+    # indicado, sin copiarlos. En otro caso, el filtro se aplica en el mismo recorrido
+    if registros is _registros_leidos:
+        return {r.nombre for r in _obtener_indice(registros, indexar_por_genero).get(filtro, [])}
+    return {r.nombre for r in registros if r.genero==filtro}
 
 
 # EJERCICIO 4:
@@ -121,11 +252,16 @@ def calcular_top_nombres_de_año(registros, año, limite=10, filtro=None):
     SALIDA: 
        - lista de tuplas (nombre, frecuencia) ordenanda de mayor a menor frecuencia  -> [(str, int)]
     '''
-    if filtro is not None:
-        registros = filtrar_por_genero(registros, filtro)
-
-    resultado = [(r.nombre, r.frecuencia) for r in registros if r.año==año]
-    resultado.sort(key=lambda x:x[1], reverse=True)
+    # El filtro de género se aplica en el mismo recorrido, sin lista intermedia.
+    # En la lista leída del fichero solo se recorren los registros del año
+    # consultado (el índice por años se calcula una sola vez)
+    if registros is _registros_leidos:
+        registros_año = _obtener_indice(registros, indexar_por_año).get(año, [])
+        resultado = [(r.nombre, r.frecuencia) for r in registros_año 
+                     if filtro is None or r.genero==filtro]
+    else:
+        resultado = ((r.nombre, r.frecuencia) for r in registros 
+                     if r.año==año and (filtro is None or r.genero==filtro))
     
     # EJEMPLOS:
     # -----------------------------------
@@ -146,8 +282,17 @@ def calcular_top_nombres_de_año(registros, año, limite=10, filtro=None):
     # sorted(L, cmp=lambda x,y:cmp(x[1],y[1]))
     # Resultado:
     # [('a', 1), ('b', 2), ('c', 3), ('d', 4)]
+    # -------------------------------------
+    # students = [('john', 'A', 15), ('jane', 'B', 12), ('dave', 'B', 10)]
+    # Ordenación DESCENDIENTE por edad con operator.itemgetter, que equivale a
+    # lambda x:x[2] pero está implementada en C y extrae la clave más rápido
+    # sorted(students, key=itemgetter(2), reverse=True)
+    # Resultado:
+    # [('john', 'A', 15), ('jane', 'B', 12), ('dave', 'B', 10)]
 
-    return resultado[:limite]
+    # heapq.nlargest obtiene los 'limite' mayores sin ordenar la lista completa,
+    # y da el mismo resultado que sorted(resultado, key=..., reverse=True)[:limite]
+    return heapq.nlargest(limite, resultado, key=itemgetter(1))
 
 
 # EJERCICIO 5:
@@ -159,6 +304,9 @@ def calcular_nombres_ambos_generos(registros):
     SALIDA: 
        - conjunto de nombres comunes a ambos géneros  -> {str}
     '''
+    # Dos comprensiones de conjunto y la intersección resultan más rápidas que un
+    # único bucle que vaya marcando con qué géneros ha aparecido cada nombre, aunque
+    # ese bucle se salte los registros de nombres ya encontrados en ambos géneros
     nombres_hombres = calcular_nombres(registros, 'Hombre')
     nombres_mujeres = calcular_nombres(registros, 'Mujer')
 
@@ -189,31 +337,20 @@ def calcular_nombre_mas_frecuente_por_año(registros, filtro=None):
     SALIDA: 
        - lista de tuplas (año, nombre, frecuencia) ordenanda por año  -> [(int, str, int)]
        
-    Se calculará en primer lugar la lista de años y, posteriormente, se buscará el nombre
-    más frecuente para cada año.
+    Se recorren los registros una sola vez, guardando para cada año el nombre con
+    mayor frecuencia encontrado hasta el momento.
     '''
-    if filtro is not None:
-        registros = filtrar_por_genero(registros, filtro)
-        
-    # Monta el conjunto de valores ordenado (años)
-    años = sorted(set(r.año for r in registros))
-    
-    # Inicializa la lista
-    nombres_mas_frecuentes = []
-
-    for año in años:
-
-        # Contiene todos los registros que cumplen la condición (if)
-        registros_año = [r for r in registros if r.año==año]
-        
-        # Usa dos variables (nombre y frecuencia) para recoger el nombre que 
-        # tiene la frecuencia mayor. 
-        _, nombre, frecuencia, _ = max(registros_año, key=lambda r:r.frecuencia)
+    # Diccionario {año: (nombre, frecuencia)} con el mejor registro de cada año
+    mejores = dict()
+    for r in registros:
+        if filtro is not None and r.genero!=filtro:
+            continue
+        actual = mejores.get(r.año)
+        # En caso de empate se conserva el primero encontrado (igual que max)
+        if actual is None or r.frecuencia > actual[1]:
+            mejores[r.año] = (r.nombre, r.frecuencia)
 
-        # Usa la variable del for (año) y las obtenidas anteriormente (nombre y frecuencia)
-        nombres_mas_frecuentes.append((año, nombre, frecuencia))
-                                      
-    return nombres_mas_frecuentes
+    return [(año, nombre, frecuencia) for año, (nombre, frecuencia) in sorted(mejores.items())]
 
 
 # EJERCICIO 8:
@@ -228,19 +365,24 @@ def calcular_frecuencia_por_año(registros, nombre):
        
     En el caso de que un nombre se use para hombres y mujeres, se sumarán ambas frecuencias
     '''
-    
-    # Monta el conjunto de valores ordenado (años)
-    años = sorted(set(r.año for r in registros))
-    
-    # Inicializa la lista
-    frecuencia_por_año = []
-    
-    for año in años:
-    
-        frecuencia = sum(r.frecuencia for r in registros if r.año==año and r.nombre==nombre)
-        frecuencia_por_año.append((año, frecuencia))
-                                      
-    return frecuencia_por_año
+
+    # Se incluyen todos los años, con frecuencia 0 aquellos en los que el nombre no se usó.
+    # En la lista leída del fichero se usan los índices por año y por nombre, que se
+    # calculan una sola vez, de modo que consultar varios nombres (p.ej. al dibujar su
+    # evolución) no vuelve a recorrer todos los registros
+    if registros is _registros_leidos:
+        años = sorted(_obtener_indice(registros, indexar_por_año))
+        frecuencias = _obtener_indice(registros, _sumar_frecuencias_por_nombre_y_año).get(nombre, {})
+        return [(año, frecuencias.get(año, 0)) for año in años]
+
+    # En otro caso, se parte de todos los años con frecuencia 0 y solo se actualiza
+    # el diccionario con los registros del nombre consultado
+    frecuencias = dict.fromkeys({r.año for r in registros}, 0)
+    for r in registros:
+        if r.nombre==nombre:
+            frecuencias[r.año] += r.frecuencia
+
+    return sorted(frecuencias.items())
     
 
 # EJERCICIO 9:
@@ -281,6 +423,10 @@ def calcular_frecuencia_acumulada(registros, nombre):
     SALIDA: 
        - suma de las frecuencias del nombre en todos los años  -> int
     '''
+    # En la lista leída del fichero se consulta el índice {nombre: frecuencia}, que se
+    # calcula una sola vez. Para cualquier otra lista basta con un recorrido
+    if registros is _registros_leidos:
+        return _obtener_indice(registros, _sumar_frecuencias_por_nombre).get(nombre, 0)
     return sum(r.frecuencia for r in registros if r.nombre==nombre)
 
 
@@ -293,22 +439,10 @@ def calcular_frecuencias_por_nombre(registros):
     SALIDA: 
        - diccionario con la frecuencia acumulada de cada nombre -> {str:int}
     '''
-    # Los diccionarios se utilizan para almacenar valores de datos en pares (clave, valor) 
-    frecuencias = dict()
-    
-    nombres = calcular_nombres(registros)
-    
-    for nombre in nombres:
-        frecuencias[nombre] = calcular_frecuencia_acumulada(registros, nombre)
-    return frecuencias
-
-    '''
-    # Solución alternativa un poco más eficiente, de O(n)
-    frecuencias = defaultdict(int)
-    for r in registros:
-        frecuencias[r.nombre] += r.frecuencia
-    return frecuencias
-    '''
+    # Se acumulan las frecuencias en un único recorrido, de O(n), en lugar de
+    # calcular la frecuencia acumulada de cada nombre por separado, de O(n·m)
+    # Se devuelve una copia del índice para que el llamador pueda modificarla
+    return dict(_obtener_indice(registros, _sumar_frecuencias_por_nombre))
 
 
 # EJERCICIO 12:
@@ -333,8 +467,11 @@ def mostrar_frecuencias_nombres(registros, limite=10):
 	en función de sus valores asociados.
     '''
     frecuencias_nombres = calcular_frecuencias_por_nombre(registros)
-    nombres = sorted(frecuencias_nombres, key=frecuencias_nombres.get, reverse=True)[:limite]
-    frecuencias = [frecuencias_nombres[nombre] for nombre in nombres]
+    # Como solo interesan los 'limite' más populares, se usa heapq.nlargest en lugar
+    # de ordenar todos los nombres
+    mas_populares = heapq.nlargest(limite, frecuencias_nombres.items(), key=itemgetter(1))
+    nombres = [nombre for nombre,_ in mas_populares]
+    frecuencias = [frecuencia for _,frecuencia in mas_populares]
     
     plt.bar(nombres, frecuencias)
     plt.xticks(rotation=80)
@@ -72,6 +72,41 @@ def test_mostrar_frecuencias_nombres(registros):
     print("TEST de 'mostrar_frecuencias_nombres'")
     mostrar_frecuencias_nombres(registros, 20)
     print()
+
+
+def test_indexar_por_año(registros):
+    print("TEST de 'indexar_por_año'")
+    registros_por_año = indexar_por_año(registros)
+    print("   - Años: {}".format(sorted(registros_por_año)))
+    año = 2008
+    print("   - Número de registros para {}: {}\n".format(año, len(registros_por_año[año])))
+
+
+def test_indexar_por_genero(registros):
+    print("TEST de 'indexar_por_genero'")
+    registros_por_genero = indexar_por_genero(registros)
+    print("   - Número de registros para '{}': {}".format('Hombre', len(registros_por_genero['Hombre'])))
+    print("   - Número de registros para '{}': {}\n".format('Mujer', len(registros_por_genero['Mujer'])))
+
+
+def test_limpiar_indices(registros):
+    print("TEST de 'limpiar_indices'")
+    nombre = 'IKER'
+    print("   - {} antes de modificar: {}".format(nombre, calcular_frecuencia_acumulada(registros, nombre)))
+
+    # Se pone a 0 la frecuencia de un registro del nombre sin cambiar la longitud
+    # de la lista: hasta llamar a 'limpiar_indices' se sigue usando el índice guardado
+    i = next(i for i, r in enumerate(registros) if r.nombre==nombre)
+    original = registros[i]
+    registros[i] = original._replace(frecuencia=0)
+    print("   - {} sin limpiar los índices: {}".format(nombre, calcular_frecuencia_acumulada(registros, nombre)))
+    limpiar_indices()
+    print("   - {} tras limpiar los índices: {}".format(nombre, calcular_frecuencia_acumulada(registros, nombre)))
+
+    # Se deja la lista como estaba
+    registros[i] = original
+    limpiar_indices()
+    print()
     
     
 ################################################################
@@ -92,3 +127,6 @@ test_mostrar_evolucion_por_año(registros)
 #test_calcular_frecuencia_acumulada(registros)
 #test_calcular_frecuencias_por_nombre(registros)
 test_mostrar_frecuencias_nombres(registros)
+#test_indexar_por_año(registros)
+#test_indexar_por_genero(registros)
+#test_limpiar_indices(registros)